@@ -18,25 +18,81 @@ Important:
 """  # End of module docstring.
 
 import cv2  # type: ignore  # OpenCV: camera capture, drawing, and face detection (Pylance stubs may be incomplete).
+import numpy as np  # Preallocated image buffers reused every frame.
 import serial  # PySerial: used to talk to Arduino over USB serial.
+from serial.tools import list_ports  # Enumerates serial devices the OS actually has.
 import time  # Used for delays and timeouts.
-from collections import deque  # Deque: fixed-length queue for smoothing face positions.
+import math  # Used by the One-Euro filter (2*pi in the cutoff).
+import os  # CPU count for sizing OpenCV's thread pool.
+import queue  # Single-slot command queue feeding the serial writer thread.
+import re  # Matching Arduino USB vendor IDs in port hardware IDs.
+import signal  # Clean shutdown on Ctrl+C / SIGTERM in headless mode.
 import sys  # Used for sys.exit when a fatal error occurs.
+import threading  # Background camera reader thread.
+from typing import ClassVar  # Marks class-level constant tables as shared, not per-instance.
+
+
+class OneEuroFilter:  # Adaptive low-pass filter (Casiez et al., CHI 2012).
+    """Smooth a noisy signal with a cutoff that rises with its speed"""  # Docstring.
+
+    def __init__(self, min_cutoff=1.0, beta=0.0, d_cutoff=1.0):  # Tuning: jitter vs. lag.
+        self.min_cutoff = min_cutoff  # Cutoff (Hz) when the signal is still; lower = smoother.
+        self.beta = beta  # How fast the cutoff rises with speed; higher = less lag when moving.
+        self.d_cutoff = d_cutoff  # Cutoff (Hz) for the speed estimate itself.
+        self.x_prev = None  # Last filtered value (None until the first sample).
+        self.dx_prev = 0.0  # Last filtered speed.
+        self.t_prev = None  # Timestamp of the last sample.
+
+    @staticmethod  # Uses no instance state.
+    def _alpha(cutoff, dt):  # Smoothing factor of a first-order low-pass.
+        tau = 1.0 / (2 * math.pi * cutoff)  # Time constant.
+        return 1.0 / (1.0 + tau / dt)  # Exponential smoothing weight.
+
+    def __call__(self, x, t):  # Feed one sample at time t (seconds), get the filtered value.
+        if self.x_prev is None:  # First sample: nothing to smooth against.
+            self.x_prev, self.t_prev = float(x), t  # Initialize state.
+            return self.x_prev  # Pass through.
+        dt = t - self.t_prev  # Time since the previous sample.
+        if dt <= 0:  # Same timestamp (or clock oddity).
+            return self.x_prev  # Keep the previous output.
+        a_d = self._alpha(self.d_cutoff, dt)  # Weight for the speed estimate.
+        dx_hat = a_d * (x - self.x_prev) / dt + (1 - a_d) * self.dx_prev  # Filtered speed.
+        cutoff = self.min_cutoff + self.beta * abs(dx_hat)  # Faster motion -> higher cutoff -> less lag.
+        a = self._alpha(cutoff, dt)  # Weight for the value.
+        self.x_prev = a * x + (1 - a) * self.x_prev  # Filtered value.
+        self.dx_prev, self.t_prev = dx_hat, t  # Save state.
+        return self.x_prev  # Smoothed output.
 
 
 class FaceTrackingRobot:  # Main class that owns camera, detector, and Arduino link.
-    def __init__(self, arduino_port=None, camera_id=0):  # Constructor parameters: serial port and camera index.
+    _CMD_NAMES: ClassVar[dict[str, str]] = {'F': 'FORWARD', 'L': 'LEFT', 'R': 'RIGHT', 'S': 'STOP'}  # Human names (built once, matches allowed commands).
+    _CMD_BYTES: ClassVar[dict[str, bytes]] = {c: c.encode() for c in _CMD_NAMES}  # Pre-encoded serial payloads (no per-write encode/alloc).
+
+    def __init__(self, arduino_port=None, camera_id=0, show_ui=True):  # Constructor parameters: serial port, camera index, preview.
         """  # Docstring for __init__.
         Initialize face tracking robot  # Create camera + optionally connect to Arduino.
         If arduino_port is None, runs in simulation mode  # Simulation prints commands instead of sending serial.
+        If show_ui is False, runs headless: no window, keys are read from stdin  # For robots without a display.
+        Serial is opened in low-latency mode where supported; on Linux USB adapters without  # FTDI/CH340 latency timer.
+        driver support, run `setserial /dev/ttyUSB0 low_latency` once  # Otherwise writes may wait up to 16 ms.
         """  # End docstring.
+        # OpenCV threading  # Small frames on low-core boards suffer from thread oversubscription.
+        cv2.setUseOptimized(True)  # Make sure SIMD-optimized code paths are enabled.
+        cv2.setNumThreads(max(1, (os.cpu_count() or 2) // 2))  # Roughly one worker per physical core.
+
+        self.show_ui = show_ui  # False = headless (no imshow/waitKey).
+
         # Arduino connection  # Section header.
         self.arduino = None  # Will hold serial.Serial object when connected.
         self.simulation_mode = False  # Becomes True if no port or connect fails.
 
         if arduino_port:  # If user provided a port string like "COM3".
             try:  # Try to open the serial connection.
-                self.arduino = serial.Serial(arduino_port, 115200, timeout=1)  # Open serial at 115200 baud.
+                self.arduino = serial.Serial(arduino_port, 115200, timeout=0.05, write_timeout=0.05)  # Open serial at 115200 baud; never block long.
+                try:  # Only pyserial's POSIX backend implements this.
+                    self.arduino.set_low_latency_mode(True)  # Sets ASYNC_LOW_LATENCY (skips the 16 ms USB latency timer).
+                except (AttributeError, NotImplementedError, OSError, ValueError):  # Windows, or driver refused.
+                    pass  # Keep the default latency.
                 time.sleep(2)  # Give Arduino time to reset after opening serial.
                 print(f"✓ Connected to Arduino on {arduino_port}")  # User feedback.
             except Exception as e:  # noqa: BLE001  # If opening serial fails (broad except to keep UX simple).
@@ -53,20 +109,50 @@ class FaceTrackingRobot:  # Main class that owns camera, detector, and Arduino l
             print("✗ Error: Could not open camera!")  # Print a clear error.
             sys.exit(1)  # Exit program with non-zero code.
 
-        # Set camera resolution  # Attempt to request resolution.
+        # Set camera format and resolution  # FOURCC first: some V4L2 drivers only honour it before the size.
+        self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))  # Compressed MJPEG: less USB bandwidth than raw YUYV.
         self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)  # Ask for width = 640 pixels.
         self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)  # Ask for height = 480 pixels.
-
-        # Load face detection model (Haar Cascade - built into OpenCV)  # Use classic Haar cascade.
-        self.face_cascade = cv2.CascadeClassifier(  # Create the classifier object.
-            cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'  # Path to pre-trained face cascade.
-        )  # End CascadeClassifier creation.
-
-        if self.face_cascade.empty():  # If the classifier failed to load.
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Keep at most one frame queued in the driver (no stale backlog).
+
+        # Background capture state  # Reader thread publishes only the newest frame.
+        self._frame_lock = threading.Lock()  # Guards the latest-frame slot.
+        self._frame_ready = threading.Condition(self._frame_lock)  # Signals the main loop when a new frame lands.
+        self._latest = None  # Most recent frame from the camera (None if the read failed).
+        self._latest_seq = 0  # Incremented per published frame so the loop never reprocesses one.
+        self._running = False  # Reader thread keeps going while this is True.
+        self._reader_thread = None  # Thread object, created in run().
+        self.frame_skip = 3  # Decode only every Nth frame (~10 FPS at 30 FPS capture is plenty for steering).
+
+        # Load face detection model (LBP cascade, falling back to Haar)  # LBP is ~2-3x cheaper per window than Haar.
+        script_dir = os.path.dirname(os.path.abspath(__file__))  # Optional model files live next to this script.
+        cascade_candidates = [  # Tried in order; first existing file that loads wins.
+            os.path.join(script_dir, 'lbpcascade_frontalface_improved.xml'),  # Bundled LBP cascade (pip wheels do not ship it).
+            os.path.join(cv2.data.haarcascades, 'lbpcascade_frontalface_improved.xml'),  # Distro/source builds that include it.
+            os.path.join(cv2.data.haarcascades, '..', 'lbpcascades', 'lbpcascade_frontalface_improved.xml'),  # Source-tree layout of OpenCV data.
+            os.path.join(cv2.data.haarcascades, 'haarcascade_frontalface_default.xml'),  # Haar fallback (always shipped with opencv-python).
+        ]  # End candidate list.
+        self.face_cascade = None  # Will hold the first classifier that loads.
+        cascade_path = None  # Path of the model actually used.
+        for cascade_path in cascade_candidates:  # Try each candidate path.
+            if not os.path.exists(cascade_path):  # Skip missing files (avoids OpenCV's "Can't open file" errors).
+                continue  # Next candidate.
+            self.face_cascade = cv2.CascadeClassifier(cascade_path)  # Create the classifier object.
+            if not self.face_cascade.empty():  # Loaded successfully.
+                break  # Stop at the first usable model.
+
+        if self.face_cascade is None or self.face_cascade.empty():  # If no classifier could be loaded.
             print("✗ Error: Could not load face detection model!")  # Print error.
             sys.exit(1)  # Exit because face detection can't run.
 
-        print("✓ Face detection model loaded")  # Inform the user it's ready.
+        print(f"✓ Face detection model loaded: {os.path.basename(cascade_path)}")  # Tell the user which model is in use.
+
+        # OpenCL (T-API)  # Lets the cascade run on an integrated GPU when one is available.
+        if cv2.ocl.haveOpenCL():  # An OpenCL runtime/device exists.
+            cv2.ocl.setUseOpenCL(True)  # Allow UMat operations to dispatch to it.
+        self.use_opencl = cv2.ocl.useOpenCL()  # False -> plain CPU path.
+        if self.use_opencl:  # Tell the user which path is active.
+            print("✓ OpenCL acceleration enabled for face detection")  # GPU path.
 
         # Tracking parameters  # Precomputed dimensions and centers.
         self.frame_width = 640  # Expected frame width (matches requested capture size).
@@ -74,11 +160,43 @@ class FaceTrackingRobot:  # Main class that owns camera, detector, and Arduino l
         self.center_x = self.frame_width // 2  # X coordinate of frame center.
         self.center_y = self.frame_height // 2  # Y coordinate of frame center.
 
+        # Detection resolution  # Cascade cost scales with pixel count, so detect on a smaller copy.
+        self.detect_scale = 2  # Downscale factor (2 -> 320x240 for 640x480); faces are >= 80px at full size anyway.
+        self._min_face_px = 80 // self.detect_scale  # Smallest face searched, in detection pixels.
+        self._max_face_px = 400 // self.detect_scale  # Largest face searched, in detection pixels.
+
+        # Detection buffers  # Reused via dst= to avoid per-frame allocations.
+        self.yunet = None  # Optional CNN detector (loaded below); stays None -> cascade path.
+        self._frame_shape = None  # (h, w) the detection buffers were sized for.
+        self._alloc_detect_buffers(self.frame_height, self.frame_width)  # Assume the requested size until a frame arrives.
+        self._flipped = np.empty((self.frame_height, self.frame_width, 3), np.uint8)  # Mirrored full-size frame.
+        self.eq_check_every = 30  # Frames between exposure checks.
+        self.eq_mean_range = (60, 200)  # Mean gray level considered well exposed (no equalization needed).
+        self.eq_std_threshold = 45  # Gray-level std-dev above which contrast is already wide enough.
+        self._eq_counter = 0  # Frames processed by detect_face.
+        self._needs_eq = True  # Whether the last exposure check asked for equalization.
+        self.eq_lut = np.arange(256, dtype=np.uint8)  # Equalization lookup table (identity until first refresh).
+        self.eq_lut_every = 10  # Frames between LUT rebuilds while equalizing.
+        self.eq_refresh = 0  # Frames since the LUT was last rebuilt.
+
+        # Optional CNN detector (YuNet)  # Vectorized conv kernels, more robust to pose/lighting than a cascade.
+        yunet_path = os.path.join(script_dir, 'face_detection_yunet_2023mar.onnx')  # Model next to this script.
+        if hasattr(cv2, 'FaceDetectorYN') and os.path.exists(yunet_path):  # Needs OpenCV >= 4.5.4 and the downloaded model.
+            self.yunet = cv2.FaceDetectorYN.create(yunet_path, "", self._detect_size, 0.7, 0.3, 5000)  # Score/NMS thresholds, top-k.
+            print("✓ YuNet face detector loaded (cascade kept as fallback)")  # Inform the user.
+
+        # Detect-and-track state  # Search near the last face before scanning the whole frame.
+        self._last_rect = None  # Last detected face in detection coordinates (None = not tracking).
+        self.roi_margin = 0.5  # ROI margin per side, as a fraction of the last face size (scales with distance).
+
         # Control parameters - ADJUST THESE FOR YOUR ROBOT  # Tuning knobs.
         self.dead_zone = 80  # Pixels near center where we don't turn.
         self.min_face_size = 15000  # Face area threshold: smaller means far away.
         self.max_face_size = 60000  # Face area threshold: larger means too close.
 
+        # Static overlay  # Guides and help text never change, so rasterize them once.
+        self._build_static_overlay(self.frame_height, self.frame_width)  # Assume the requested size until a frame arrives.
+
         # Search parameters  # Bookkeeping only (we always return 'R' when no face).
         self.no_face_counter = 0  # Counts consecutive frames with no detected face.
         self.search_direction = 'L'  # Legacy field (currently unused).
@@ -86,12 +204,24 @@ class FaceTrackingRobot:  # Main class that owns camera, detector, and Arduino l
         self.search_timeout = 2.0  # Seconds without a face before searching.
 
         # Face position history for smoothing  # Reduces jitter.
-        self.face_positions = deque(maxlen=5)  # Keep last 5 face measurements.
+        self.fx = OneEuroFilter(min_cutoff=1.0, beta=0.01)  # Face center x (pixels).
+        self.f_area = OneEuroFilter(min_cutoff=1.0, beta=0.0005)  # Face area (pixels^2, so a much smaller beta).
 
         # Movement control  # State variables.
         self.movement_enabled = True  # Always True in this version (no keyboard toggle).
         self.last_command = None  # Last command sent, used to reduce spam.
-        self.command_count = 0  # Counter used to periodically resend command.
+        self._last_cmd_ts = 0.0  # time.monotonic() when the last command was queued (heartbeat resend).
+        self.heartbeat_period = 0.5  # Seconds before an unchanged command is re-sent.
+
+        # Serial writer thread  # Keeps blocking UART writes off the frame loop.
+        self._cmd_q = queue.Queue(maxsize=1)  # Holds only the newest pending command.
+        self._writer_thread = None  # Started below when a real Arduino is connected.
+        self.serial_min_interval = 0.02  # Seconds between writes (50 Hz max, matches the firmware loop rate).
+        if not self.simulation_mode and self.arduino:  # Only needed for real serial output.
+            self._writer_thread = threading.Thread(target=self._writer, daemon=True)  # Background writer.
+            self._writer_thread.start()  # Start consuming commands.
+        self.display_every = 2  # Redraw/show the preview only every Nth processed frame (UI is for humans, not control).
+        self.frame_idx = 0  # Processed-frame counter (drives preview cadence).
 
         print("\n" + "="*50)  # Print a divider line.
         print("FACE TRACKING ROBOT CONTROLS")  # Title.
@@ -101,32 +231,113 @@ class FaceTrackingRobot:  # Main class that owns camera, detector, and Arduino l
         print("Press 'q' to quit")  # Key hint.
         print("="*50 + "\n")  # Divider and spacing.
 
-    def detect_face(self, frame):  # Given a frame, try to find a face.
-        """Detect faces in frame using Haar Cascade"""  # Method docstring.
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)  # Convert BGR image to grayscale.
-
-        # Enhance contrast for better detection  # Helps Haar cascade on low-contrast images.
-        gray = cv2.equalizeHist(gray)  # Histogram equalization.
+    def _alloc_detect_buffers(self, height, width):  # Size the downscale buffers for a given frame size.
+        """Allocate detection buffers for frames of height x width"""  # Docstring.
+        k = self.detect_scale  # Downscale factor.
+        det_w, det_h = max(1, width // k), max(1, height // k)  # Detection image size.
+        self._frame_shape = (height, width)  # Remember what we sized for.
+        self._detect_size = (det_w, det_h)  # (w, h) for cv2.resize.
+        self._scale_x, self._scale_y = width / det_w, height / det_h  # Detection -> full-frame factors (exact per axis).
+        self._small = np.empty((det_h, det_w, 3), np.uint8)  # Downscaled BGR frame.
+        self._gray = np.empty((det_h, det_w), np.uint8)  # Grayscale copy of the downscaled frame.
+        self._gray_eq = np.empty_like(self._gray)  # Histogram-equalized grayscale.
+        self._last_rect = None  # Old ROI coordinates are meaningless at a new size.
+        if self.yunet is not None:  # YuNet needs to know its input size.
+            self.yunet.setInputSize(self._detect_size)  # Match the new buffers.
 
-        # Detect faces  # Return list of rectangles.
-        faces = self.face_cascade.detectMultiScale(  # Run multi-scale detection.
-            gray,  # Input image (grayscale).
-            scaleFactor=1.1,  # Step between scales; smaller = slower but more accurate.
-            minNeighbors=6,  # Higher = fewer false positives.
-            minSize=(80, 80),  # Ignore tiny detections.
-            maxSize=(400, 400),  # Ignore huge detections.
-            flags=cv2.CASCADE_SCALE_IMAGE  # Compatibility flag.
-        )  # End detectMultiScale.
+    def detect_face(self, frame):  # Given a frame, try to find a face.
+        """Detect faces in frame using the loaded cascade (LBP or Haar)"""  # Method docstring.
+        if frame.shape[:2] != self._frame_shape:  # Camera ignored the requested size (or it changed).
+            self._alloc_detect_buffers(*frame.shape[:2])  # Re-size buffers once; later frames reuse them.
+        # Detect on a downscaled copy  # Cascade cost scales with pixel count.
+        cv2.resize(frame, self._detect_size, dst=self._small, interpolation=cv2.INTER_AREA)  # Downscale BGR first (less for cvtColor).
+        if self.yunet is not None:  # CNN path works on BGR directly.
+            return self._detect_yunet()  # No grayscale/equalization needed.
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)  # Convert BGR image to grayscale in place.
+
+        # Enhance contrast only when exposure is poor  # Auto-exposure cameras rarely need it.
+        if self._eq_counter % self.eq_check_every == 0:  # Re-check exposure periodically, not every frame.
+            mean, std = cv2.meanStdDev(self._gray)  # One pass for brightness and contrast.
+            lo, hi = self.eq_mean_range  # Acceptable mean brightness.
+            well_exposed = lo <= mean[0, 0] <= hi  # Not too dark or too bright.
+            needs_eq = not well_exposed and std[0, 0] <= self.eq_std_threshold  # Skip when either the mean or the contrast looks fine.
+            if needs_eq and not self._needs_eq:  # Equalization just switched on.
+                self.eq_refresh = 0  # Force a fresh LUT instead of reusing a stale one.
+            self._needs_eq = needs_eq  # Remember the decision until the next check.
+        self._eq_counter += 1  # Count frames since start.
+        gray = self._gray  # Use the plain grayscale by default.
+        if self._needs_eq:  # Lighting is bad.
+            if self.eq_refresh % self.eq_lut_every == 0:  # Scene changes slowly, so rebuild the LUT only now and then.
+                self._update_eq_lut()  # Recompute the equalization mapping from this frame.
+            self.eq_refresh += 1  # Frames since the LUT was rebuilt (modulo eq_lut_every).
+            cv2.LUT(self._gray, self.eq_lut, dst=self._gray_eq)  # Apply equalization as a 256-entry lookup.
+            gray = self._gray_eq  # Detect on the equalized image.
+
+        # Track: search a padded window around the last face first  # Far fewer pixels than a full scan.
+        faces = ()  # No detections yet.
+        off_x, off_y = 0, 0  # Offset of the searched region inside the detection image.
+        if self._last_rect is not None:  # We saw a face on the previous frame.
+            lx, ly, lw, lh = self._last_rect  # Previous face (detection coordinates).
+            pad_x, pad_y = int(lw * self.roi_margin), int(lh * self.roi_margin)  # Bigger faces move more pixels per frame.
+            img_h, img_w = gray.shape  # Detection image bounds.
+            off_x, off_y = max(0, lx - pad_x), max(0, ly - pad_y)  # Clamp ROI top-left.
+            x2, y2 = min(img_w, lx + lw + pad_x), min(img_h, ly + lh + pad_y)  # Clamp ROI bottom-right.
+            min_px, max_px = self._min_face_px, self._max_face_px  # Global size limits.
+            min_size = (max(min_px, lw // 2), max(min_px, lh // 2))  # Face can at most halve in size between frames...
+            max_size = (min(max_px, lw * 2), min(max_px, lh * 2))  # ...or double; skips pyramid levels outside that.
+            faces = self._scan(gray[off_y:y2, off_x:x2], min_size, max_size)  # ROI scan.
+
+        # Detect: full-frame scan when not tracking or the ROI lost the face  # Never report a miss the full scan would catch.
+        if len(faces) == 0:  # Nothing from the ROI (or no ROI).
+            off_x, off_y = 0, 0  # Full image has no offset.
+            full = cv2.UMat(gray) if self.use_opencl else gray  # Upload for the OpenCL cascade (ROIs are too small to be worth it).
+            faces = self._scan(full, (self._min_face_px, self._min_face_px), (self._max_face_px, self._max_face_px))  # Full scan (80-400px at full resolution).
 
         if len(faces) == 0:  # If no faces detected.
+            self._last_rect = None  # Drop the track; next frame starts with a full scan.
             return None  # Signal to caller that no face exists.
 
         # Get the largest face  # Prefer the closest/most prominent face.
         largest_face = max(faces, key=lambda rect: rect[2] * rect[3])  # Choose by area w*h.
         x, y, w, h = largest_face  # Unpack rectangle.
-
+        x, y = x + off_x, y + off_y  # Translate ROI coordinates back to the detection image.
+        self._last_rect = (x, y, w, h)  # Remember for the next frame's ROI.
+
+        sx, sy = self._scale_x, self._scale_y  # Detection -> full-frame factors.
+        return (int(x * sx), int(y * sy), int(w * sx), int(h * sy))  # Return bounding box scaled back to full-frame coordinates.
+
+    def _update_eq_lut(self):  # Rebuild the histogram-equalization lookup table.
+        """Compute the same mapping as cv2.equalizeHist from the current grayscale frame"""  # Docstring.
+        hist = cv2.calcHist([self._gray], [0], None, [256], [0, 256]).ravel()  # 256-bin histogram.
+        cdf = hist.cumsum()  # Cumulative distribution.
+        cdf_min = cdf[np.argmax(cdf > 0)]  # Count at the darkest occupied level.
+        total = cdf[-1]  # Number of pixels.
+        if total == cdf_min:  # Single gray level: nothing to stretch.
+            self.eq_lut = np.arange(256, dtype=np.uint8)  # Identity mapping.
+            return  # Done.
+        lut = np.round((cdf - cdf_min) * 255.0 / (total - cdf_min))  # Stretch the CDF to 0..255.
+        self.eq_lut = np.clip(lut, 0, 255).astype(np.uint8)  # uint8 table for cv2.LUT.
+
+    def _detect_yunet(self):  # YuNet detection on the downscaled BGR buffer.
+        """Detect the most confident face with YuNet, in full-frame coordinates"""  # Docstring.
+        _, faces = self.yunet.detect(self._small)  # Rows: x, y, w, h, 5 landmarks, score.
+        if faces is None or len(faces) == 0:  # If no faces detected.
+            return None  # Signal to caller that no face exists.
+        best = max(faces, key=lambda row: row[-1])  # Highest confidence score.
+        sx, sy = self._scale_x, self._scale_y  # Detection -> full-frame factors.
+        x, y, w, h = int(best[0] * sx), int(best[1] * sy), int(best[2] * sx), int(best[3] * sy)  # Scale and convert to ints for drawing.
         return (x, y, w, h)  # Return bounding box.
 
+    def _scan(self, gray, min_size, max_size):  # Run the cascade on a grayscale image or ROI.
+        """Run detectMultiScale with the shared tuning parameters"""  # Docstring.
+        return self.face_cascade.detectMultiScale(  # Run multi-scale detection.
+            gray,  # Input image (grayscale).
+            scaleFactor=1.2,  # Step between scales; larger = fewer pyramid levels to scan.
+            minNeighbors=6,  # Higher = fewer false positives.
+            minSize=min_size,  # Ignore tiny detections.
+            maxSize=max_size,  # Ignore huge detections.
+        )  # End detectMultiScale.
+
     def calculate_movement_command(self, face_rect):  # Decide what command to send.
         """Calculate movement command based on face position"""  # Docstring.
         if face_rect is None:  # If we did not detect a face.
@@ -139,24 +350,14 @@ class FaceTrackingRobot:  # Main class that owns camera, detector, and Arduino l
         self.no_face_counter = 0  # Clear counter.
         self.last_face_time = time.time()  # Update last-seen timestamp.
 
-        x, y, w, h = face_rect  # Unpack bounding box.
+        x, _, w, h = face_rect  # Unpack bounding box (y is not used for steering).
         face_center_x = x + w // 2  # Compute face center x.
-        face_center_y = y + h // 2  # Compute face center y (currently not used in command).
         face_area = w * h  # Compute face area (proxy for distance).
 
-        # Add to history for smoothing  # Keep last few measurements.
-        self.face_positions.append((face_center_x, face_center_y, face_area))  # Push tuple.
-
-        # Calculate average from history  # Smooth by simple mean.
-        if len(self.face_positions) > 0:  # If there is history (always true after append).
-            avg_x = int(sum(pos[0] for pos in self.face_positions) / len(self.face_positions))  # Mean x.
-            _avg_y = int(sum(pos[1] for pos in self.face_positions) / len(self.face_positions))  # Mean y (kept for completeness).
-            avg_area = int(sum(pos[2] for pos in self.face_positions) / len(self.face_positions))  # Mean area.
-        else:  # Defensive fallback.
-            avg_x, _avg_y, avg_area = face_center_x, face_center_y, face_area  # Use current values.
-
-        # Calculate horizontal offset from center  # Left/right error for turning.
-        offset_x = avg_x - self.center_x  # Positive means face is to the right.
+        # Smooth with One-Euro filters  # Heavy smoothing when still, light smoothing when moving.
+        t = time.monotonic()  # Timestamp drives the adaptive cutoff.
+        avg_x = int(self.fx(face_center_x, t))  # Smoothed x.
+        avg_area = int(self.f_area(face_area, t))  # Smoothed area.
 
         # Decision logic (commands restricted to F/L/R/S):
         # - If face is "too close" (area above max threshold) => Stop 'S'.
@@ -164,34 +365,62 @@ class FaceTrackingRobot:  # Main class that owns camera, detector, and Arduino l
         # - Else (face detected and roughly centered) => Move forward 'F'.
         if avg_area > self.max_face_size:  # Face too close → stop.
             return 'S'
-        if abs(offset_x) >= self.dead_zone:  # Face not centered → turn toward it.
-            return 'L' if offset_x < 0 else 'R'
+        if avg_x <= self.center_x - self.dead_zone:  # Face left of the dead zone → turn left.
+            return 'L'
+        if avg_x >= self.center_x + self.dead_zone:  # Face right of the dead zone → turn right.
+            return 'R'
         return 'F'  # Face detected and centered enough → advance.
 
     def send_to_arduino(self, command):  # Send command over serial or simulate.
         """Send command to Arduino"""  # Docstring.
-        allowed = {'F', 'L', 'R', 'S'}  # Only these commands are permitted to be sent.
-        if command not in allowed:  # If command is outside allowed set, do nothing.
+        if command not in self._CMD_BYTES:  # Only F/L/R/S are permitted; anything else is ignored.
             return False  # Silently ignore disallowed commands.
         if not self.simulation_mode and self.arduino and self.movement_enabled:  # Only send if real mode.
-            try:  # Serial write might fail.
-                self.arduino.write(command.encode())  # Convert string to bytes and send.
-                return True  # Report success.
-            except Exception as e:  # noqa: BLE001  # Handle serial errors (broad except keeps the loop running).
-                print(f"✗ Error sending to Arduino: {e}")  # Print why it failed.
-                return False  # Report failure.
+            self._enqueue(command)  # Hand off to the writer thread (never blocks the frame loop).
+            return True  # Report success (write errors are reported by the writer).
         elif self.simulation_mode:  # In simulation we don't send serial.
-            cmd_names = {'F': 'FORWARD', 'L': 'LEFT', 'R': 'RIGHT', 'S': 'STOP'}  # Human names (filtered to allowed).
-            print(f"[SIM] Command: {cmd_names.get(command, command)}")  # Print simulated movement.
+            print(f"[SIM] Command: {self._CMD_NAMES.get(command, command)}")  # Print simulated movement.
             return True  # Simulation always "succeeds".
         return False  # Movement disabled or missing serial connection.
 
+    def _enqueue(self, item):  # Put into the single-slot queue, replacing anything pending.
+        """Queue a command for the writer thread, dropping an unsent older one"""  # Docstring.
+        try:  # Fast path: slot is free.
+            self._cmd_q.put_nowait(item)  # Queue the item.
+        except queue.Full:  # An older command has not been written yet.
+            try:  # The writer may have taken it meanwhile.
+                self._cmd_q.get_nowait()  # Drop the stale command.
+            except queue.Empty:  # Writer got there first.
+                pass  # Slot is free now.
+            self._cmd_q.put_nowait(item)  # Only this thread produces, so the slot is free.
+
+    def _writer(self):  # Serial thread body.
+        """Write queued commands to the Arduino until a None sentinel arrives"""  # Docstring.
+        while True:  # Until cleanup() sends the sentinel.
+            command = self._cmd_q.get()  # Block until there is something to send.
+            if command is None:  # Shutdown sentinel.
+                break  # Leave the thread.
+            try:  # Serial write might fail.
+                self.arduino.write(self._CMD_BYTES[command])  # Send the pre-encoded byte.
+            except Exception as e:  # noqa: BLE001  # Handle serial errors (broad except keeps the thread running).
+                print(f"✗ Error sending to Arduino: {e}")  # Print why it failed.
+            time.sleep(self.serial_min_interval)  # Cap the write rate; newer commands coalesce in the slot meanwhile.
+
+    def _build_static_overlay(self, height, width):  # Rasterize the never-changing UI parts.
+        """Draw center lines, dead zone and help text into an overlay of height x width"""  # Docstring.
+        overlay = np.zeros((height, width, 3), np.uint8)  # Black canvas.
+        cv2.line(overlay, (self.center_x, 0), (self.center_x, height), (0, 255, 0), 1)  # Vertical center.
+        cv2.line(overlay, (0, self.center_y), (width, self.center_y), (0, 255, 0), 1)  # Horizontal center.
+        cv2.rectangle(overlay, (self.center_x - self.dead_zone, 0), (self.center_x + self.dead_zone, height), (0, 100, 0), 1)  # Dead-zone box.
+        cv2.putText(overlay, "Press 'q': Quit", (10, height - 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)  # Instructions.
+        self._static_overlay = overlay  # Keep for every frame.
+        self._static_mask = overlay.any(axis=2)[..., None]  # Pixels the overlay actually paints.
+
     def draw_interface(self, frame, face_rect, command):  # Overlay UI on frame.
         """Draw tracking interface on frame"""  # Docstring.
-        cv2.line(frame, (self.center_x, 0), (self.center_x, self.frame_height), (0, 255, 0), 1)  # Draw vertical center.
-        cv2.line(frame, (0, self.center_y), (self.frame_width, self.center_y), (0, 255, 0), 1)  # Draw horizontal center.
-
-        cv2.rectangle(frame, (self.center_x - self.dead_zone, 0), (self.center_x + self.dead_zone, self.frame_height), (0, 100, 0), 1)  # Dead-zone box.
+        if frame.shape != self._static_overlay.shape:  # Camera ignored the requested size (or it changed).
+            self._build_static_overlay(*frame.shape[:2])  # Rebuild once for the real size.
+        np.copyto(frame, self._static_overlay, where=self._static_mask)  # Center lines, dead zone and help text in one copy.
 
         if face_rect:  # If we have a detected face.
             x, y, w, h = face_rect  # Unpack face rectangle.
@@ -224,8 +453,7 @@ class FaceTrackingRobot:  # Main class that owns camera, detector, and Arduino l
         status_text = "ACTIVE" if self.movement_enabled else "PAUSED"  # Human status.
         cv2.putText(frame, f"Status: {status_text}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, status_color, 2)  # Draw status.
 
-        cmd_names = {'F': 'FORWARD', 'L': 'LEFT', 'R': 'RIGHT', 'S': 'STOP'}  # Display map (matches allowed commands).
-        cmd_text = cmd_names.get(command, command)  # Convert command letter to text.
+        cmd_text = self._CMD_NAMES.get(command, command)  # Convert command letter to text.
         cmd_color = (0, 255, 0) if command == 'S' else (0, 255, 255)  # Color STOP green else yellow.
         cv2.putText(frame, f"Command: {cmd_text}", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, cmd_color, 2)  # Draw command.
 
@@ -235,43 +463,108 @@ class FaceTrackingRobot:  # Main class that owns camera, detector, and Arduino l
         if self.no_face_counter > 0:  # Only show if we have missed face frames.
             cv2.putText(frame, f"No face: {self.no_face_counter} frames", (10, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1)  # Draw count.
 
-        cv2.putText(frame, "Press 'q': Quit", (10, self.frame_height - 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)  # Instructions simplified.
-
         return frame  # Return the modified frame.
 
     # manual_control_mode removed: per request we only send auto F/L/R/S based on detection.
 
+    @staticmethod  # Uses no instance state.
+    def _stdin_reader(keys):  # Headless key thread body.
+        """Push key codes typed on stdin into the keys queue"""  # Docstring.
+        for line in sys.stdin:  # Blocks per line; ends on EOF.
+            for ch in line.strip():  # Each typed character.
+                keys.put(ord(ch))  # Same codes as waitKey returns.
+
+    def _reader(self):  # Camera thread body.
+        """Continuously read frames, keeping only the most recent one"""  # Docstring.
+        grabbed = 0  # Frames pulled from the driver so far.
+        while self._running:  # Until cleanup() stops us.
+            ret = self.cap.grab()  # Advance the stream; blocks for one frame period (outside the lock).
+            grabbed += 1  # Count every grabbed frame.
+            if ret and grabbed % self.frame_skip != 0:  # Not a frame we process.
+                continue  # Skip decode/colour conversion entirely.
+            f = None  # Default when grab failed.
+            if ret:  # Only decode frames we will actually use.
+                ret, f = self.cap.retrieve()  # Decode the grabbed frame to BGR.
+            with self._frame_ready:  # Publish under the lock.
+                self._latest = f if ret else None  # Replace the slot; older frames are simply dropped.
+                self._latest_seq += 1  # Mark as new for the main loop.
+                if not ret:  # Camera failed or disconnected.
+                    self._running = False  # Stop reading; main loop will see None and exit.
+                self._frame_ready.notify()  # Wake the main loop.
+
     def run(self):  # Automatic tracking loop.
         """Main tracking loop"""  # Docstring.
         print("Starting face tracking...")  # Startup message.
 
         # Per request: do NOT send initial STOP; start in passive state and only send F/L/R/S from detection.
 
-        while True:  # Main capture loop.
-            ret, frame = self.cap.read()  # Read one frame from camera.
-            if not ret:  # If reading failed.
+        self._running = True  # Allow the reader thread to run.
+        self._reader_thread = threading.Thread(target=self._reader, daemon=True)  # Capture off the main thread.
+        self._reader_thread.start()  # Start grabbing frames.
+        seen_seq = 0  # Sequence number of the last frame we processed.
+
+        # Bind hot-loop lookups to locals once  # Saves attribute/global lookups every iteration.
+        frame_ready = self._frame_ready  # Condition shared with the reader thread.
+        flip = cv2.flip  # Mirror function.
+        flipped = self._flipped  # Reused mirror buffer.
+        detect = self.detect_face  # Face detector.
+        calc = self.calculate_movement_command  # Command decision.
+        send = self.send_to_arduino  # Serial/simulation output.
+        draw = self.draw_interface  # Overlay renderer.
+        imshow = cv2.imshow  # Preview window update.
+        wait_key = cv2.waitKey  # GUI event pump / key read.
+        monotonic = time.monotonic  # Clock for the heartbeat.
+        quit_key = ord('q')  # Key code that ends the loop.
+        show_ui = self.show_ui  # Preview window enabled?
+        keys = queue.Queue()  # Keystrokes from stdin (headless mode only).
+        stop = threading.Event()  # Set by a signal handler to end the loop.
+        if not show_ui:  # No window, so no waitKey: read commands from the terminal instead.
+            threading.Thread(target=self._stdin_reader, args=(keys,), daemon=True).start()  # Background key reader.
+            for sig in (signal.SIGINT, signal.SIGTERM):  # Ctrl+C, or a service manager stopping us.
+                signal.signal(sig, lambda _signum, _stack: stop.set())  # Finish the current frame, then clean up.
+            print("Headless mode: type 'q' and press Enter to quit")  # Tell the user how to stop.
+
+        while True:  # Main processing loop.
+            with frame_ready:  # Take the newest frame from the reader.
+                while self._latest_seq == seen_seq and self._running and not stop.is_set():  # Nothing new yet.
+                    frame_ready.wait(0.5)  # Sleep until the reader publishes (timeout guards shutdown).
+                seen_seq = self._latest_seq  # Remember which frame we took.
+                frame = self._latest  # Reader allocates a new array per read, so no copy is needed.
+            if stop.is_set():  # Signalled to quit (headless).
+                print("\nShutting down...")  # Tell user.
+                break  # Exit loop.
+            if frame is None:  # If reading failed.
                 print("✗ Error: Could not read frame!")  # Print error.
                 break  # Leave loop.
 
-            frame = cv2.flip(frame, 1)  # Mirror horizontally for user-friendly view.
+            if frame.shape != flipped.shape:  # Camera ignored the requested size (or it changed).
+                self._flipped = flipped = np.empty_like(frame)  # Re-size the mirror buffer once; later frames reuse it.
+            frame = flip(frame, 1, dst=flipped)  # Mirror horizontally into the reused buffer.
 
-            face_rect = self.detect_face(frame)  # Detect face in current frame.
+            face_rect = detect(frame)  # Detect face in current frame (the reader already decimated frames).
 
-            command = self.calculate_movement_command(face_rect)  # Decide movement command.
+            command = calc(face_rect)  # Decide movement command.
 
-            if command != self.last_command or self.command_count % 5 == 0:  # Reduce serial spam.
-                self.send_to_arduino(command)  # Send command.
+            now = monotonic()  # Monotonic: immune to wall-clock jumps.
+            if command != self.last_command or now - self._last_cmd_ts > self.heartbeat_period:  # Send on change, plus a heartbeat.
+                send(command)  # Send command.
                 self.last_command = command  # Remember last command.
-
-            self.command_count += 1  # Increment counter.
-
-            frame = self.draw_interface(frame, face_rect, command)  # Draw overlays.
-
-            cv2.imshow("Face Tracking Robot", frame)  # Show window.
-
-            key = cv2.waitKey(1) & 0xFF  # Read key.
-
-            if key == ord('q'):  # Quit.
+                self._last_cmd_ts = now  # Restart the heartbeat timer.
+
+            if show_ui:  # Preview window path.
+                if self.frame_idx % self.display_every == 0:  # Only refresh the preview on some frames.
+                    frame = draw(frame, face_rect, command)  # Draw overlays.
+                    imshow("Face Tracking Robot", frame)  # Show window.
+                key = wait_key(1) & 0xFF  # Read key (blocks >= 1 ms for the GUI pump).
+            else:  # Headless path: never blocks.
+                try:  # Poll the stdin queue.
+                    key = keys.get_nowait()  # Next typed key.
+                except queue.Empty:  # Nothing typed.
+                    key = -1  # No key.
+
+            self.frame_idx += 1  # Next processed frame.
+
+            if key == quit_key:  # Quit.
                 print("\nShutting down...")  # Tell user.
                 break  # Exit loop.
             # Per request: only support quitting; no toggles or extra commands.
@@ -282,13 +575,25 @@ class FaceTrackingRobot:  # Main class that owns camera, detector, and Arduino l
         """Cleanup resources"""  # Docstring.
         print("\nCleaning up...")  # Notify user.
 
+        self._running = False  # Ask the reader thread to stop.
+        if self._reader_thread is not None:  # Only if run() started it.
+            self._reader_thread.join(timeout=1.0)  # Wait for the in-flight read to finish.
+
+        if self._writer_thread is not None:  # Stop the serial writer before touching the port here.
+            self._enqueue(None)  # Sentinel replaces any unsent command.
+            self._writer_thread.join(timeout=1.0)  # Let an in-flight write finish.
+
         if not self.simulation_mode and self.arduino:  # If we have a real Arduino connection.
-            self.arduino.write(b'S')  # Send a final STOP before closing (safety on exit).
-            time.sleep(0.1)  # Give it time.
+            try:  # With a short write_timeout this can raise SerialTimeoutException.
+                self.arduino.write(self._CMD_BYTES['S'])  # Send a final STOP before closing (safety on exit).
+                time.sleep(0.1)  # Give it time.
+            except Exception as e:  # noqa: BLE001  # Keep cleaning up (close port, release camera) regardless.
+                print(f"✗ Error sending to Arduino: {e}")  # Print why it failed.
             self.arduino.close()  # Close serial port.
 
         self.cap.release()  # Release camera.
-        cv2.destroyAllWindows()  # Close OpenCV windows.
+        if self.show_ui:  # Headless OpenCV builds do not implement HighGUI calls.
+            cv2.destroyAllWindows()  # Close OpenCV windows.
 
         print("✓ Cleanup complete")  # Done.
         print("Goodbye!")  # Final message.
@@ -296,15 +601,15 @@ class FaceTrackingRobot:  # Main class that owns camera, detector, and Arduino l
 
 def find_arduino_port():  # Helper to guess Arduino port.
     """Try to automatically find Arduino port"""  # Docstring.
-    # Detect common Arduino ports on Windows
-    ports = [f"COM{i}" for i in range(1, 10)]  # Try COM1..COM9.
-    for port in ports:  # Try each candidate.
-        try:  # Opening might fail.
-            ser = serial.Serial(port, 115200, timeout=1)  # Attempt to open.
-            ser.close()  # Close immediately if successful.
-            return port  # Return the first working port.
-        except Exception:  # Ignore and keep trying other ports.
-            continue  # Next port.
+    # Ask the OS which serial devices exist (any platform, no blocking opens)
+    ports = list(list_ports.comports())  # Each present serial device.
+    for p in ports:  # First pass: devices that clearly identify as an Arduino.
+        if ('Arduino' in (p.manufacturer or '')  # Genuine boards report the manufacturer.
+                or re.search(r'2341:|2A03:', p.hwid or '', re.IGNORECASE)):  # Arduino USB vendor IDs.
+            return p.device  # e.g. "COM3" or "/dev/ttyACM0".
+    for p in ports:  # Second pass: any USB-serial bridge (clone boards with CH340/FTDI chips).
+        if 'USB' in (p.description or ''):  # Generic USB serial adapter.
+            return p.device  # Best guess; the user is asked to confirm in main().
 
     return None  # No port detected.
 
@@ -338,7 +643,8 @@ def main():  # Script entry point.
     except Exception:  # If user typed non-number.
         camera_id = 0  # Default to 0.
 
-    robot = FaceTrackingRobot(arduino_port=arduino_port, camera_id=camera_id)  # Create the controller.
+    show_ui = '--headless' not in sys.argv  # `python ObjectDetection.py --headless` disables the preview window.
+    robot = FaceTrackingRobot(arduino_port=arduino_port, camera_id=camera_id, show_ui=show_ui)  # Create the controller.
     robot.run()  # Run until user quits.
 
 
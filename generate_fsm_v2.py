@@ -1,9 +1,12 @@
 import networkx as nx
+import matplotlib
+matplotlib.use('Agg')  # Files only: skip interactive backend setup
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 
 def setup_plot(title, subtitle=None, figsize=(6, 5)):
-    plt.figure(figsize=figsize)
+    fig = plt.figure(num='fsm', clear=True)  # Reuse one figure across all FSMs
+    fig.set_size_inches(*figsize)
     plt.title(title, fontsize=12, fontweight='bold', pad=20)
     if subtitle:
         plt.text(0.5, 0.92, subtitle, ha='center', va='center', transform=plt.gcf().transFigure, fontsize=9, style='italic')
@@ -54,7 +57,6 @@ def create_rotate_fsm():
     
     plt.tight_layout()
     plt.savefig("fsm_rotate.png", dpi=150)
-    plt.close()
     print("Generated fsm_rotate.png")
 
 def create_move_fsm():
@@ -97,7 +99,6 @@ def create_move_fsm():
 
     plt.tight_layout()
     plt.savefig("fsm_move.png", dpi=150)
-    plt.close()
     print("Generated fsm_move.png")
 
 def create_arduino_loop_fsm():
@@ -144,10 +145,13 @@ def create_arduino_loop_fsm():
     
     plt.tight_layout()
     plt.savefig("fsm_arduino_loop.png", dpi=150)
-    plt.close()
     print("Generated fsm_arduino_loop.png")
 
-if __name__ == "__main__":
+def render_all():
+    """Render every FSM diagram in one process, sharing the matplotlib setup."""
     create_rotate_fsm()
     create_move_fsm()
     create_arduino_loop_fsm()
+
+if __name__ == "__main__":
+    render_all()